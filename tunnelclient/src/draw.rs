@@ -52,16 +52,14 @@ where
     }
 }
 
-#[inline]
-fn color_from_rgb(r: f64, g: f64, b: f64, a: f64) -> Color {
-    [r as f32, g as f32, b as f32, a as f32]
-}
-
 /// Convert HSV to a Piston RGB color.
+///
+/// The conversion is performed in single precision, since that is what the
+/// color ends up as anyway; the inputs are narrowed once up front.
 #[inline]
-fn hsv_to_rgb(hue: f64, sat: f64, val: f64, alpha: f64) -> Color {
+fn hsv_to_rgb(hue: f32, sat: f32, val: f32, alpha: f32) -> Color {
     if sat == 0.0 {
-        color_from_rgb(val, val, val, alpha)
+        [val, val, val, alpha]
     } else {
         let var_h = if hue == 1.0 { 0.0 } else { hue * 6.0 };
 
@@ -70,13 +68,13 @@ fn hsv_to_rgb(hue: f64, sat: f64, val: f64, alpha: f64) -> Color {
         let var_2 = val * (1.0 - sat * (var_h - var_i));
         let var_3 = val * (1.0 - sat * (1.0 - (var_h - var_i)));
 
-        match var_i as i64 {
-            0 => color_from_rgb(val, var_3, var_1, alpha),
-            1 => color_from_rgb(var_2, val, var_1, alpha),
-            2 => color_from_rgb(var_1, val, var_3, alpha),
-            3 => color_from_rgb(var_1, var_2, val, alpha),
-            4 => color_from_rgb(var_3, var_1, val, alpha),
-            _ => color_from_rgb(val, var_1, var_2, alpha),
+        match var_i as i32 {
+            0 => [val, var_3, var_1, alpha],
+            1 => [var_2, val, var_1, alpha],
+            2 => [var_1, val, var_3, alpha],
+            3 => [var_1, var_2, val, alpha],
+            4 => [var_3, var_1, val, alpha],
+            _ => [val, var_1, var_2, alpha],
         }
     }
 }
@@ -85,7 +83,12 @@ impl<G: Graphics> Draw<G> for ArcSegment {
     fn draw(&self, c: &Context, gl: &mut G, cfg: &ClientConfig) {
         let thickness = self.thickness * cfg.critical_size * cfg.thickness_scale / 2.0;
 
-        let color = hsv_to_rgb(self.hue, self.sat, self.val, self.level);
+        let color = hsv_to_rgb(
+            self.hue as f32,
+            self.sat as f32,
+            self.val as f32,
+            self.level as f32,
+        );
 
         let (x, y) = {
             let (x0, y0) = match cfg.transformation {
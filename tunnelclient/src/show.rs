@@ -22,6 +22,7 @@ use std::time::Duration;
 use tunnels_lib::RunFlag;
 use tunnels_lib::Snapshot;
 use tunnels_lib::Timestamp;
+use tunnels_lib::SNAPSHOT_PORT;
 use zero_configure::pub_sub::Receiver;
 use zmq::Context;
 
@@ -268,10 +269,11 @@ impl RenderIssueLogger {
                 warn!("No data available from snapshot service.");
             }
             Error(snaps) => {
-                let snap_times = snaps.iter().map(|s| s.time).collect::<Vec<_>>();
+                // Only collect the snapshot times if the log record will be emitted.
                 error!(
                     "Something went wrong with snapshot interpolation for time {}.\n{:?}\n",
-                    delayed_time, snap_times
+                    delayed_time,
+                    snaps.iter().map(|s| s.time).collect::<Vec<_>>()
                 );
                 self.missed += 1;
             }
@@ -324,7 +326,7 @@ fn receive_snapshots(
     let mut receiver: Receiver<Snapshot> = Receiver::new(
         ctx,
         &cfg.server_hostname,
-        6000,
+        SNAPSHOT_PORT,
         Some(&[cfg.video_channel as u8]),
     )?;
     thread::Builder::new()
@@ -361,10 +363,8 @@ fn update_timesync(
     thread::Builder::new()
         .name("timesync".to_string())
         .spawn(move || {
-            // FIXME: rather than sleep/flag polling we should use a select
-            // mechanism to ensure prompt quit.
-            while run_flag.should_run() {
-                thread::sleep(period);
+            // Wait on the run flag rather than sleeping, so we quit promptly.
+            while run_flag.wait(period) {
                 match client.synchronize() {
                     Ok(sync) => {
                         let new_estimate = sync.now();
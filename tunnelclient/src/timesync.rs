@@ -11,12 +11,10 @@ use std::sync::Arc;
 use std::sync::Mutex;
 use std::thread::sleep;
 use std::time::{Duration, Instant};
-use tunnels_lib::{number::UnipolarFloat, Timestamp};
+use tunnels_lib::{number::UnipolarFloat, Timestamp, TIMESYNC_PORT};
 use zero_configure::msgpack::{Receive, ReceiveResult};
 use zmq::{Context, Socket, DONTWAIT};
 
-const PORT: u64 = 8989;
-
 /// Provide estimates of the offset between this host's monotonic clock and the server's.
 pub struct Client {
     socket: Socket,
@@ -30,7 +28,7 @@ impl Client {
     /// Create a new 0mq REQ connected to the provided socket addr.
     pub fn new(host: &str, ctx: Context) -> Result<Self> {
         let socket = ctx.socket(zmq::REQ)?;
-        let addr = format!("tcp://{}:{}", host, PORT);
+        let addr = format!("tcp://{}:{}", host, TIMESYNC_PORT);
         socket.connect(&addr)?;
 
         Ok(Client {
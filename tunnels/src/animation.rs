@@ -84,47 +84,40 @@ impl Animation {
         }
     }
 
-    pub fn get_value(
+    /// Capture the state needed to evaluate this animation for a frame.
+    /// Return None if the animation is inactive.
+    ///
+    /// The waveform, clock phase and level scaling are the same for every
+    /// segment of a frame, so they are looked up once here rather than for
+    /// every sample.
+    pub fn sampler(
         &self,
-        spatial_phase_offset: Phase,
         external_clocks: &impl ClockStore,
         audio_envelope: UnipolarFloat,
-    ) -> f64 {
+    ) -> Option<AnimationSampler<'_>> {
         if !self.active() {
-            return 0.;
+            return None;
         }
-        let waveform_func = match self.waveform {
-            Waveform::Sine => waveforms::sine,
-            Waveform::Square => waveforms::square,
-            Waveform::Sawtooth => waveforms::sawtooth,
-            Waveform::Triangle => waveforms::triangle,
-            Waveform::Constant => waveforms::constant,
-        };
-        let mut result = self.size.val()
-            * waveform_func(&WaveformArgs {
-                phase_spatial: spatial_phase_offset * (self.n_periods as f64),
-                phase_temporal: self.phase(external_clocks),
-                smoothing: self.smoothing,
-                duty_cycle: self.duty_cycle,
-                pulse: self.pulse,
-                standing: self.standing,
-            });
-
-        // scale this animation by submaster level if using external clock
         let mut use_audio_size = self.use_audio_size;
-        if let Some(id) = self.clock_source {
-            result *= external_clocks.submaster_level(id).val();
+        // scale this animation by submaster level if using external clock
+        let submaster_level = self.clock_source.map(|id| {
             use_audio_size = use_audio_size || external_clocks.use_audio_size(id);
-        }
-        // scale this animation by audio envelope if set
-        if use_audio_size {
-            result *= audio_envelope.val();
-        }
-        if self.invert {
-            -1.0 * result
-        } else {
-            result
-        }
+            external_clocks.submaster_level(id).val()
+        });
+        Some(AnimationSampler {
+            animation: self,
+            waveform_func: match self.waveform {
+                Waveform::Sine => waveforms::sine,
+                Waveform::Square => waveforms::square,
+                Waveform::Sawtooth => waveforms::sawtooth,
+                Waveform::Triangle => waveforms::triangle,
+                Waveform::Constant => waveforms::constant,
+            },
+            phase_temporal: self.phase(external_clocks),
+            submaster_level,
+            // scale this animation by audio envelope if set
+            audio_level: use_audio_size.then(|| audio_envelope.val()),
+        })
     }
 
     /// Emit the current value of all controllable animator state.
@@ -208,6 +201,43 @@ impl Animation {
     }
 }
 
+/// The state of an animation frozen for a single frame.
+pub struct AnimationSampler<'a> {
+    animation: &'a Animation,
+    waveform_func: fn(&WaveformArgs) -> f64,
+    phase_temporal: Phase,
+    submaster_level: Option<f64>,
+    audio_level: Option<f64>,
+}
+
+impl<'a> AnimationSampler<'a> {
+    /// Return the value of the animation at the provided spatial offset.
+    pub fn sample(&self, spatial_phase_offset: Phase) -> f64 {
+        let anim = self.animation;
+        let mut result = anim.size.val()
+            * (self.waveform_func)(&WaveformArgs {
+                phase_spatial: spatial_phase_offset * (anim.n_periods as f64),
+                phase_temporal: self.phase_temporal,
+                smoothing: anim.smoothing,
+                duty_cycle: anim.duty_cycle,
+                pulse: anim.pulse,
+                standing: anim.standing,
+            });
+
+        if let Some(level) = self.submaster_level {
+            result *= level;
+        }
+        if let Some(level) = self.audio_level {
+            result *= level;
+        }
+        if anim.invert {
+            -1.0 * result
+        } else {
+            result
+        }
+    }
+}
+
 #[derive(Debug, Clone)]
 pub enum StateChange {
     Waveform(Waveform),
@@ -25,6 +25,7 @@ impl Beam {
         }
     }
 
+    /// Render this beam, appending the resulting arc segments to arcs.
     pub fn render(
         &self,
         level: UnipolarFloat,
@@ -33,7 +34,8 @@ impl Beam {
         color_palette: &ColorPalette,
         positions: &PositionBank,
         audio_envelope: UnipolarFloat,
-    ) -> Vec<ArcSegment> {
+        arcs: &mut Vec<ArcSegment>,
+    ) {
         match self {
             Self::Tunnel(t) => t.render(
                 level,
@@ -42,6 +44,7 @@ impl Beam {
                 color_palette,
                 positions,
                 audio_envelope,
+                arcs,
             ),
             Self::Look(l) => l.render(
                 level,
@@ -50,6 +53,7 @@ impl Beam {
                 color_palette,
                 positions,
                 audio_envelope,
+                arcs,
             ),
         }
     }
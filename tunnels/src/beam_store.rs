@@ -31,8 +31,10 @@ impl BeamStore {
         self.beams[addr.row][addr.col] = beam;
     }
 
-    pub fn get(&mut self, addr: BeamStoreAddr) -> Option<Beam> {
-        self.beams[addr.row][addr.col].clone()
+    /// Borrow the beam at this address, if there is one.
+    /// Callers clone only what they actually need.
+    pub fn get(&self, addr: BeamStoreAddr) -> Option<&Beam> {
+        self.beams[addr.row][addr.col].as_ref()
     }
 
     pub fn items(&self) -> impl Iterator<Item = (BeamStoreAddr, &Option<Beam>)> {
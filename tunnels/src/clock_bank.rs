@@ -99,14 +99,7 @@ impl ClockBank {
 
     /// Return a static snapshot of the state of this clock bank.
     pub fn as_static(&self) -> [StaticClock; N_CLOCKS] {
-        // FIXME: need this method to avoid having to write this out explicitly
-        // https://doc.rust-lang.org/std/primitive.array.html#method.each_ref
-        [
-            self.0[0].as_static(),
-            self.0[1].as_static(),
-            self.0[2].as_static(),
-            self.0[3].as_static(),
-        ]
+        std::array::from_fn(|i| self.0[i].as_static())
     }
 
     pub fn emit_state<E: EmitStateChange>(&self, emitter: &mut E) {
@@ -1,63 +1,186 @@
 use anyhow::Result;
-use std::sync::mpsc::{channel, Receiver, RecvTimeoutError, Sender};
+use log::warn;
+use std::collections::VecDeque;
+use std::mem;
+use std::sync::{Arc, Condvar, Mutex};
 use std::time::Duration;
 
 use crate::master_ui::EmitStateChange;
 use crate::midi_controls::Dispatcher as MidiDispatcher;
 use crate::show::{ControlMessage, StateChange};
 use crate::{
-    midi::{DeviceSpec as MidiDeviceSpec, Event as MidiEvent},
+    midi::{DeviceSpec as MidiDeviceSpec, Event as MidiEvent, EventType as MidiEventType},
     midi_controls::Device as MidiDevice,
-    osc::{Device as OscDevice, DeviceSpec as OscDeviceSpec, Dispatcher as OscDispatcher},
+    osc::{DeviceSpec as OscDeviceSpec, Dispatcher as OscDispatcher},
 };
-use anyhow::bail;
-use rosc::OscMessage;
+
+/// How many control events can be waiting for the show at once.
+/// The queue is allocated up front at this size; if the show falls this far
+/// behind, the oldest waiting events are dropped to make room for new ones.
+const CONTROL_EVENT_QUEUE_SIZE: usize = 4096;
 
 /// Top-level enum for the types of control messages the show can receive.
 pub enum ControlEvent {
     Midi((MidiDevice, MidiEvent)),
-    Osc((OscDevice, OscMessage)),
+    /// OSC messages are already mapped to show controls by their input thread.
+    Osc(ControlMessage),
+}
+
+/// Bounded queue of control events waiting for the show.
+struct ControlEventQueue {
+    state: Mutex<ControlEventQueueState>,
+    ready: Condvar,
+}
+
+struct ControlEventQueueState {
+    events: VecDeque<ControlEvent>,
+    /// How many events have been dropped since the queue last had room.
+    dropped: usize,
+}
+
+impl ControlEventQueue {
+    fn new() -> Self {
+        Self {
+            state: Mutex::new(ControlEventQueueState {
+                events: VecDeque::with_capacity(CONTROL_EVENT_QUEUE_SIZE),
+                dropped: 0,
+            }),
+            ready: Condvar::new(),
+        }
+    }
+
+    /// Wait up to timeout for a control event to arrive, then move as many
+    /// queued events as are waiting into events, up to max_events.
+    /// Runs of control changes from the same control are collapsed to the
+    /// last one.
+    fn recv_batch(&self, timeout: Duration, max_events: usize, events: &mut Vec<ControlEvent>) {
+        let state = self.state.lock().unwrap();
+        let (mut state, _) = self
+            .ready
+            .wait_timeout_while(state, timeout, |state| state.events.is_empty())
+            .unwrap();
+        let n = state.events.len().min(max_events);
+        let mut batch = state.events.drain(..n).peekable();
+        while let Some(event) = batch.next() {
+            // Skip events made redundant by the one queued right behind them.
+            if let Some(next) = batch.peek() {
+                if supersedes(next, &event) {
+                    continue;
+                }
+            }
+            events.push(event);
+        }
+    }
+}
+
+/// Handle for input threads to queue control events for the show.
+#[derive(Clone)]
+pub struct ControlEventSender(Arc<ControlEventQueue>);
+
+impl ControlEventSender {
+    /// Queue a control event for the show without blocking the input thread.
+    /// If the queue is full the oldest waiting event is dropped, so the most
+    /// recent state of every control always makes it through.
+    /// Drops happen in bursts, so we log once when they start and once with a
+    /// count when the queue has room again, rather than for every event.
+    pub fn send(&self, event: ControlEvent) {
+        let (dropping, recovered) = {
+            let mut state = self.0.state.lock().unwrap();
+            let mut dropping = false;
+            let mut recovered = 0;
+            if state.events.len() >= CONTROL_EVENT_QUEUE_SIZE {
+                state.events.pop_front();
+                state.dropped += 1;
+                dropping = state.dropped == 1;
+            } else {
+                recovered = mem::take(&mut state.dropped);
+            }
+            state.events.push_back(event);
+            (dropping, recovered)
+        };
+        self.0.ready.notify_one();
+        if dropping {
+            warn!("Control event queue is full, dropping the oldest events.");
+        }
+        if recovered > 0 {
+            warn!(
+                "Control event queue has room again; dropped {} events.",
+                recovered
+            );
+        }
+    }
 }
 
 pub struct Dispatcher {
     midi_dispatcher: MidiDispatcher,
-    osc_dispatcher: OscDispatcher,
-    recv: Receiver<ControlEvent>,
-    // Hang onto a copy of this for when we're running in test mode, otherwise
-    // the channel is closed instantly and we do not block properly.
-    _send: Sender<ControlEvent>,
+    _osc_dispatcher: OscDispatcher,
+    events: Arc<ControlEventQueue>,
+    /// Reused buffer for the events taken off the queue in one receive.
+    batch: Vec<ControlEvent>,
 }
 
 impl Dispatcher {
     /// Instantiate the master control dispatcher.
     pub fn new(midi_devices: Vec<MidiDeviceSpec>, osc_devices: Vec<OscDeviceSpec>) -> Result<Self> {
-        let (send, recv) = channel();
+        let send = ControlEventSender(Arc::new(ControlEventQueue::new()));
 
         Ok(Self {
             midi_dispatcher: MidiDispatcher::new(midi_devices, send.clone())?,
-            osc_dispatcher: OscDispatcher::new(osc_devices, send.clone())?,
-            recv,
-            _send: send,
+            _osc_dispatcher: OscDispatcher::new(osc_devices, send.clone())?,
+            events: send.0,
+            batch: Vec::new(),
         })
     }
 
-    pub fn receive(&self, timeout: Duration) -> Result<Option<ControlMessage>> {
-        let event = match self.recv.recv_timeout(timeout) {
-            Ok(e) => e,
-            Err(RecvTimeoutError::Timeout) => {
-                return Ok(None);
-            }
-            Err(RecvTimeoutError::Disconnected) => {
-                bail!("Control event channel is disconnected!");
+    /// Receive show control messages into msgs.
+    /// Wait up to timeout for a control event to arrive; once one has, also
+    /// take any further events that are already queued, up to max_events in
+    /// total. Runs of control changes from the same control are collapsed to
+    /// the last one.
+    pub fn receive(
+        &mut self,
+        timeout: Duration,
+        max_events: usize,
+        msgs: &mut Vec<ControlMessage>,
+    ) {
+        let mut batch = mem::take(&mut self.batch);
+        self.events.recv_batch(timeout, max_events, &mut batch);
+        for event in batch.drain(..) {
+            if let Some(msg) = self.map_event(event) {
+                msgs.push(msg);
             }
-        };
+        }
+        self.batch = batch;
+    }
+
+    /// Map a control event to a show control message.
+    fn map_event(&self, event: ControlEvent) -> Option<ControlMessage> {
         use ControlEvent::*;
         match event {
-            Midi((device, event)) => Ok(self
+            Midi((device, event)) => self
                 .midi_dispatcher
-                .map_event_to_show_control(device, event)),
-            Osc((device, event)) => self.osc_dispatcher.map_event_to_show_control(device, event),
+                .map_event_to_show_control(device, event),
+            Osc(msg) => Some(msg),
+        }
+    }
+
+    /// Send any buffered UI updates out to the control surfaces.
+    pub fn flush(&mut self) {
+        self.midi_dispatcher.flush();
+    }
+}
+
+/// Return true if handling next makes handling event redundant.
+/// All of our midi control changes set an absolute value, so in a run of them
+/// from the same control only the last one matters.
+fn supersedes(next: &ControlEvent, event: &ControlEvent) -> bool {
+    match (next, event) {
+        (ControlEvent::Midi((next_device, next)), ControlEvent::Midi((device, event))) => {
+            event.mapping.event_type == MidiEventType::ControlChange
+                && next.mapping == event.mapping
+                && next_device == device
         }
+        _ => false,
     }
 }
 
@@ -67,6 +190,95 @@ impl EmitStateChange for Dispatcher {
         self.midi_dispatcher.emit(sc);
         // FIXME: need to borrow state change messages instead of moving them
         // if we want state changes to fan-out to different control types.
-        // self.osc_dispatcher.emit(sc);
+        // self._osc_dispatcher.emit(sc);
+    }
+}
+
+#[cfg(test)]
+mod test {
+    use super::*;
+    use crate::midi::{cc, event, note_off, note_on, Mapping};
+
+    const TIMEOUT: Duration = Duration::from_millis(10);
+
+    fn send_midi(send: &ControlEventSender, mapping: Mapping, value: u8) {
+        send.send(ControlEvent::Midi((
+            MidiDevice::AkaiApc40,
+            event(mapping, value),
+        )));
+    }
+
+    /// Receive one batch of events as (mapping, value) pairs.
+    fn receive(dispatcher: &Dispatcher, max_events: usize) -> Vec<(Mapping, u8)> {
+        let mut events = Vec::new();
+        dispatcher
+            .events
+            .recv_batch(TIMEOUT, max_events, &mut events);
+        events
+            .into_iter()
+            .map(|event| match event {
+                ControlEvent::Midi((_, event)) => (event.mapping, event.value),
+                ControlEvent::Osc(_) => panic!("unexpected OSC event"),
+            })
+            .collect()
+    }
+
+    #[test]
+    fn test_collapse_control_change_run() -> Result<()> {
+        let dispatcher = Dispatcher::new(vec![], vec![])?;
+        let send = ControlEventSender(dispatcher.events.clone());
+        for value in 0..10 {
+            send_midi(&send, cc(0, 1), value);
+        }
+        assert_eq!(vec![(cc(0, 1), 9)], receive(&dispatcher, 64));
+        Ok(())
+    }
+
+    #[test]
+    fn test_notes_do_not_collapse() -> Result<()> {
+        let dispatcher = Dispatcher::new(vec![], vec![])?;
+        let send = ControlEventSender(dispatcher.events.clone());
+        send_midi(&send, note_on(0, 1), 127);
+        send_midi(&send, note_off(0, 1), 0);
+        send_midi(&send, note_on(0, 1), 127);
+        send_midi(&send, note_on(0, 1), 127);
+        assert_eq!(
+            vec![
+                (note_on(0, 1), 127),
+                (note_off(0, 1), 0),
+                (note_on(0, 1), 127),
+                (note_on(0, 1), 127),
+            ],
+            receive(&dispatcher, 64)
+        );
+        Ok(())
+    }
+
+    #[test]
+    fn test_interleaved_controls_do_not_collapse() -> Result<()> {
+        let dispatcher = Dispatcher::new(vec![], vec![])?;
+        let send = ControlEventSender(dispatcher.events.clone());
+        send_midi(&send, cc(0, 1), 1);
+        send_midi(&send, cc(0, 2), 2);
+        send_midi(&send, cc(0, 1), 3);
+        send_midi(&send, cc(0, 2), 4);
+        assert_eq!(
+            vec![(cc(0, 1), 1), (cc(0, 2), 2), (cc(0, 1), 3), (cc(0, 2), 4)],
+            receive(&dispatcher, 64)
+        );
+        Ok(())
+    }
+
+    #[test]
+    fn test_collapse_stops_at_batch_boundary() -> Result<()> {
+        let dispatcher = Dispatcher::new(vec![], vec![])?;
+        let send = ControlEventSender(dispatcher.events.clone());
+        for value in 1..=3 {
+            send_midi(&send, cc(0, 1), value);
+        }
+        assert_eq!(vec![(cc(0, 1), 2)], receive(&dispatcher, 2));
+        assert_eq!(vec![(cc(0, 1), 3)], receive(&dispatcher, 2));
+        assert!(receive(&dispatcher, 2).is_empty());
+        Ok(())
     }
 }
@@ -26,8 +26,8 @@ impl Look {
 
     /// Draw all the Beams in this Look.
     ///
-    /// The individual subchannels are unpacked and returned as a single channel of
-    /// many arc segment commands.
+    /// The individual subchannels are unpacked and appended to arcs as a single
+    /// channel of many arc segment commands.
     pub fn render(
         &self,
         level: UnipolarFloat,
@@ -36,19 +36,18 @@ impl Look {
         color_palette: &ColorPalette,
         positions: &PositionBank,
         audio_envelope: UnipolarFloat,
-    ) -> Vec<ArcSegment> {
-        let mut arcs = Vec::new();
+        arcs: &mut Vec<ArcSegment>,
+    ) {
         for channel in &self.channels {
-            let mut rendered = channel.render(
+            channel.render(
                 level,
                 mask,
                 external_clocks,
                 color_palette,
                 positions,
                 audio_envelope,
+                arcs,
             );
-            arcs.append(&mut rendered);
         }
-        arcs
     }
 }
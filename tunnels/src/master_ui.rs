@@ -213,7 +213,7 @@ impl MasterUI {
                 // Request to replace the beam in the current mixer with
                 // the beam in this button.
                 if let Some(beam) = self.beam_store.get(addr) {
-                    *self.current_beam(mixer) = beam;
+                    *self.current_beam(mixer) = beam.clone();
                     self.emit_current_channel_state(mixer, emitter);
                 }
             }
@@ -235,7 +235,7 @@ impl MasterUI {
                 // If the beam in the requested slot is a look, explode
                 // it into the mixer.
                 if let Some(Beam::Look(look)) = self.beam_store.get(addr) {
-                    mixer.set_look(look, emitter);
+                    mixer.set_look(look.clone(), emitter);
                     self.emit_current_channel_state(mixer, emitter);
                     self.set_beam_store_state(Idle, emitter);
                 }
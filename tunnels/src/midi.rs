@@ -2,9 +2,15 @@ use anyhow::{anyhow, bail, Result};
 use log::{error, warn};
 use midir::{MidiIO, MidiInput, MidiInputConnection, MidiOutput, MidiOutputConnection, SendError};
 use serde::{Deserialize, Serialize};
-use std::{fmt, sync::mpsc::Sender};
+use std::{
+    collections::{hash_map::Entry, HashMap, HashSet},
+    fmt,
+};
 
-use crate::{control::ControlEvent, midi_controls::Device};
+use crate::{
+    control::{ControlEvent, ControlEventSender},
+    midi_controls::Device,
+};
 
 /// Specification for what type of midi event.
 #[derive(Debug, Copy, Clone, Hash, PartialEq, Eq, PartialOrd, Ord, Serialize, Deserialize)]
@@ -159,7 +165,7 @@ pub struct Input {
 }
 
 impl Input {
-    pub fn new(name: String, device: Device, sender: Sender<ControlEvent>) -> Result<Self> {
+    pub fn new(name: String, device: Device, sender: ControlEventSender) -> Result<Self> {
         let input = MidiInput::new("tunnels")?;
         let port = get_named_port(&input, &name)?;
         let handler_name = name.clone();
@@ -169,6 +175,12 @@ impl Input {
                 &port,
                 &name,
                 move |_, msg: &[u8], _| {
+                    // System messages such as midi clock and active sensing
+                    // can arrive many times a second; we don't use any of
+                    // them, so drop them before doing any other work.
+                    if msg[0] >= 0xF0 {
+                        return;
+                    }
                     let event_type = match msg[0] >> 4 {
                         8 => EventType::NoteOff,
                         9 => EventType::NoteOn,
@@ -182,19 +194,17 @@ impl Input {
                         }
                     };
                     let channel = msg[0] & 15;
-                    sender
-                        .send(ControlEvent::Midi((
-                            device,
-                            Event {
-                                mapping: Mapping {
-                                    event_type,
-                                    channel,
-                                    control: msg[1],
-                                },
-                                value: msg[2],
+                    sender.send(ControlEvent::Midi((
+                        device,
+                        Event {
+                            mapping: Mapping {
+                                event_type,
+                                channel,
+                                control: msg[1],
                             },
-                        )))
-                        .unwrap();
+                            value: msg[2],
+                        },
+                    )));
                 },
                 (),
             )
@@ -204,16 +214,21 @@ impl Input {
 }
 
 /// Maintain midi inputs and outputs.
-/// Provide synchronous dispatch for outgoing messages based on device type.
+/// Outgoing messages are buffered per control and dispatched by device type
+/// when the manager is flushed.
 #[derive(Default)]
 pub struct Manager {
     inputs: Vec<Input>,
     outputs: Vec<Output>,
+    /// The device types we have at least one output for.
+    output_devices: HashSet<Device>,
+    /// Outgoing events buffered since the last flush.
+    queue: OutputQueue,
 }
 
 impl Manager {
     /// Add a device to the manager given input and output port names.
-    pub fn add_device(&mut self, spec: DeviceSpec, send: Sender<ControlEvent>) -> Result<()> {
+    pub fn add_device(&mut self, spec: DeviceSpec, send: ControlEventSender) -> Result<()> {
         let input = Input::new(spec.input_port_name, spec.device, send)?;
         let mut output = Output::new(spec.output_port_name, spec.device)?;
 
@@ -221,23 +236,80 @@ impl Manager {
         spec.device.init_midi(&mut output)?;
 
         self.inputs.push(input);
+        self.output_devices.insert(output.device);
         self.outputs.push(output);
         Ok(())
     }
 
-    /// Send a message to the specified device type.
-    /// Error conditions are logged rather than returned.
+    /// Queue a message for the specified device type.
+    /// If a message for the same control is already queued, it is replaced,
+    /// so only the most recent value is sent on the next flush.
+    /// UI updates are emitted for every device type we know how to talk to;
+    /// messages for device types with no connected output are dropped here.
     pub fn send(&mut self, device: Device, event: Event) {
-        for output in &mut self.outputs {
-            if output.device == device {
-                if let Err(e) = output.send(event) {
-                    error!("Failed to send midi event to {}: {}.", output.name, e);
+        if !self.output_devices.contains(&device) {
+            return;
+        }
+        self.queue.push(device, event);
+    }
+
+    /// Send all queued messages to the outputs for their device type.
+    /// Error conditions are logged rather than returned.
+    pub fn flush(&mut self) {
+        for (device, event) in self.queue.drain() {
+            for output in &mut self.outputs {
+                if output.device == device {
+                    if let Err(e) = output.send(event) {
+                        error!("Failed to send midi event to {}: {}.", output.name, e);
+                    }
                 }
             }
         }
     }
 }
 
+/// Outgoing midi events, holding only the most recent event for each control.
+#[derive(Default)]
+struct OutputQueue {
+    /// Buffered events in the order their control was first queued.
+    pending: Vec<(Device, Event)>,
+    /// Position in pending of the buffered event for each device control.
+    pending_index: HashMap<(Device, Mapping), usize>,
+}
+
+impl OutputQueue {
+    /// Queue an event, replacing any event already queued for the same control.
+    fn push(&mut self, device: Device, event: Event) {
+        // Note on and note off for the same note address the same control.
+        let event_type = match event.mapping.event_type {
+            EventType::NoteOff => EventType::NoteOn,
+            other => other,
+        };
+        let key = (
+            device,
+            Mapping {
+                event_type,
+                ..event.mapping
+            },
+        );
+        match self.pending_index.entry(key) {
+            Entry::Occupied(slot) => {
+                self.pending[*slot.get()].1 = event;
+            }
+            Entry::Vacant(slot) => {
+                slot.insert(self.pending.len());
+                self.pending.push((device, event));
+            }
+        }
+    }
+
+    /// Remove and return all queued events.
+    fn drain(&mut self) -> impl Iterator<Item = (Device, Event)> + '_ {
+        self.pending_index.clear();
+        self.pending.drain(..)
+    }
+}
+
 /// Wrapper struct for the data needed to describe a device to connect to.
 #[derive(Clone, Debug)]
 pub struct DeviceSpec {
@@ -245,3 +317,60 @@ pub struct DeviceSpec {
     pub input_port_name: String,
     pub output_port_name: String,
 }
+
+#[cfg(test)]
+mod test {
+    use super::*;
+
+    fn drain(queue: &mut OutputQueue) -> Vec<(Device, Mapping, u8)> {
+        queue
+            .drain()
+            .map(|(device, event)| (device, event.mapping, event.value))
+            .collect()
+    }
+
+    #[test]
+    fn test_output_queue_replaces_in_place() {
+        let mut queue = OutputQueue::default();
+        queue.push(Device::AkaiApc40, event(cc(0, 1), 1));
+        queue.push(Device::AkaiApc40, event(cc(0, 2), 2));
+        queue.push(Device::AkaiApc40, event(cc(0, 1), 3));
+        assert_eq!(
+            vec![
+                (Device::AkaiApc40, cc(0, 1), 3),
+                (Device::AkaiApc40, cc(0, 2), 2),
+            ],
+            drain(&mut queue)
+        );
+        assert!(drain(&mut queue).is_empty());
+    }
+
+    #[test]
+    fn test_output_queue_note_off_replaces_note_on() {
+        let mut queue = OutputQueue::default();
+        queue.push(Device::AkaiApc40, event(note_on(0, 1), 127));
+        queue.push(Device::AkaiApc40, event(note_off(0, 1), 0));
+        assert_eq!(
+            vec![(Device::AkaiApc40, note_off(0, 1), 0)],
+            drain(&mut queue)
+        );
+    }
+
+    #[test]
+    fn test_output_queue_preserves_order() {
+        let mut queue = OutputQueue::default();
+        queue.push(Device::AkaiApc40, event(cc(0, 1), 1));
+        queue.push(Device::AkaiApc20, event(cc(0, 1), 2));
+        queue.push(Device::AkaiApc40, event(note_on(0, 1), 3));
+        queue.push(Device::AkaiApc40, event(cc(1, 1), 4));
+        assert_eq!(
+            vec![
+                (Device::AkaiApc40, cc(0, 1), 1),
+                (Device::AkaiApc20, cc(0, 1), 2),
+                (Device::AkaiApc40, note_on(0, 1), 3),
+                (Device::AkaiApc40, cc(1, 1), 4),
+            ],
+            drain(&mut queue)
+        );
+    }
+}
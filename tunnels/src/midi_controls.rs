@@ -8,10 +8,10 @@ mod mixer;
 mod tunnel;
 
 use log::debug;
-use std::{collections::HashMap, sync::mpsc::Sender};
+use std::collections::HashMap;
 
 use crate::{
-    control::ControlEvent,
+    control::ControlEventSender,
     master_ui::EmitStateChange,
     midi::{DeviceSpec, Event, Manager, Mapping},
     show::ControlMessage,
@@ -116,7 +116,7 @@ pub struct Dispatcher {
 impl Dispatcher {
     /// Instantiate the master midi control dispatcher.
     /// Create the midi control map and initialize midi inputs/outputs.
-    pub fn new(midi_devices: Vec<DeviceSpec>, send: Sender<ControlEvent>) -> Result<Self> {
+    pub fn new(midi_devices: Vec<DeviceSpec>, send: ControlEventSender) -> Result<Self> {
         let midi_map = ControlMap::new();
 
         let mut midi_manager = Manager::default();
@@ -148,6 +148,11 @@ impl Dispatcher {
             }
         }
     }
+
+    /// Send all UI update midi messages queued since the last flush.
+    pub fn flush(&mut self) {
+        self.midi_manager.flush();
+    }
 }
 
 impl EmitStateChange for Dispatcher {
@@ -57,27 +57,31 @@ impl Mixer {
         self.channels.len()
     }
 
-    /// Render the current state of the mixer.
+    /// Render the current state of the mixer into video_outs.
     /// Each inner vector represents one virtual video channel.
+    /// Any previous contents are cleared, but the buffers are reused.
     pub fn render(
         &self,
         external_clocks: &ClockBank,
         color_palette: &ColorPalette,
         positions: &PositionBank,
         audio_envelope: UnipolarFloat,
-    ) -> Vec<LayerCollection> {
-        let mut video_outs = Vec::with_capacity(Self::N_VIDEO_CHANNELS);
-        for _ in 0..Self::N_VIDEO_CHANNELS {
-            video_outs.push(Vec::new());
+        video_outs: &mut Vec<LayerCollection>,
+    ) {
+        video_outs.resize_with(Self::N_VIDEO_CHANNELS, Vec::new);
+        for layers in video_outs.iter_mut() {
+            layers.clear();
         }
         for channel in &self.channels {
-            let rendered_beam = channel.render(
+            let mut rendered_beam = Vec::new();
+            channel.render(
                 UnipolarFloat::ONE,
                 false,
                 external_clocks,
                 color_palette,
                 positions,
                 audio_envelope,
+                &mut rendered_beam,
             );
             if rendered_beam.is_empty() {
                 continue;
@@ -87,7 +91,6 @@ impl Mixer {
                 video_outs[video_chan.0].push(rendered_ptr.clone());
             }
         }
-        video_outs
     }
 
     /// Emit the current value of all controllable mixer state.
@@ -200,7 +203,7 @@ impl Channel {
         self.beam.update_state(delta_t, audio_envelope);
     }
 
-    /// Render the beam in this channel.
+    /// Render the beam in this channel, appending the arc segments to arcs.
     pub fn render(
         &self,
         level_scale: UnipolarFloat,
@@ -209,7 +212,8 @@ impl Channel {
         color_palette: &ColorPalette,
         positions: &PositionBank,
         audio_envelope: UnipolarFloat,
-    ) -> Vec<ArcSegment> {
+        arcs: &mut Vec<ArcSegment>,
+    ) {
         let mut level: UnipolarFloat = if self.bump {
             UnipolarFloat::ONE
         } else {
@@ -218,7 +222,7 @@ impl Channel {
         level *= level_scale;
         // if this channel is off, don't render at all
         if level == 0. {
-            return Vec::new();
+            return;
         }
         self.beam.render(
             level,
@@ -227,7 +231,8 @@ impl Channel {
             color_palette,
             positions,
             audio_envelope,
-        )
+            arcs,
+        );
     }
 }
 
@@ -4,12 +4,11 @@ use derive_more::Display;
 use log::{debug, error, warn};
 use rosc::{OscMessage, OscPacket, OscType};
 use std::net::{SocketAddr, UdpSocket};
-use std::sync::mpsc::Sender;
 use std::thread;
 use tunnels_lib::color::Rgb;
 use tunnels_lib::number::UnipolarFloat;
 
-use crate::control::ControlEvent;
+use crate::control::{ControlEvent, ControlEventSender};
 use crate::master_ui::EmitStateChange;
 use crate::palette::{ControlMessage as PaletteControlMessage, StateChange as PaletteStateChange};
 use crate::position_bank::Position;
@@ -34,31 +33,29 @@ pub struct Dispatcher {
 }
 
 impl Dispatcher {
-    pub fn new(osc_devices: Vec<DeviceSpec>, send: Sender<ControlEvent>) -> Result<Self> {
+    pub fn new(osc_devices: Vec<DeviceSpec>, send: ControlEventSender) -> Result<Self> {
         let mut inputs = Vec::new();
         for osc_device in osc_devices {
             inputs.push(Input::new(osc_device, send.clone())?);
         }
         Ok(Self { _inputs: inputs })
     }
+}
 
-    /// Map the provided OSC event to a show control message.
-    /// Return None if the event does not map to a known control.
-    pub fn map_event_to_show_control(
-        &self,
-        device: Device,
-        event: OscMessage,
-    ) -> Result<Option<ControlMessage>> {
-        match event.addr.as_str() {
-            "/palette" => handle_palette(event.args).map(Some),
-            "/position" => handle_position(event.args).map(Some),
-            unknown => {
-                debug!(
-                    "Unknown OSC command from device {} with address {}: {:?}",
-                    device, unknown, event.args
-                );
-                Ok(None)
-            }
+/// Map the provided OSC event to a show control message.
+/// Return None if the event does not map to a known control.
+/// OSC mapping doesn't depend on any show state, so this runs on the input
+/// thread rather than the show thread.
+fn map_event_to_show_control(device: Device, event: OscMessage) -> Result<Option<ControlMessage>> {
+    match event.addr.as_str() {
+        "/palette" => handle_palette(event.args).map(Some),
+        "/position" => handle_position(event.args).map(Some),
+        unknown => {
+            debug!(
+                "Unknown OSC command from device {} with address {}: {:?}",
+                device, unknown, event.args
+            );
+            Ok(None)
         }
     }
 }
@@ -138,7 +135,7 @@ impl EmitStateChange for Dispatcher {
 struct Input(DeviceSpec);
 
 impl Input {
-    pub fn new(spec: DeviceSpec, send: Sender<ControlEvent>) -> Result<Self> {
+    pub fn new(spec: DeviceSpec, send: ControlEventSender) -> Result<Self> {
         let socket = UdpSocket::bind(spec.addr)?;
 
         let mut buf = [0u8; rosc::decoder::MTU];
@@ -163,12 +160,17 @@ impl Input {
     }
 }
 
-/// Recursively unpack OSC packets and send all the inner messages as control events.
-fn forward_packet(packet: OscPacket, device: Device, send: &Sender<ControlEvent>) {
+/// Recursively unpack OSC packets, map all the inner messages to show
+/// controls, and send them as control events.
+fn forward_packet(packet: OscPacket, device: Device, send: &ControlEventSender) {
     match packet {
-        OscPacket::Message(m) => {
-            send.send(ControlEvent::Osc((device, m))).unwrap();
-        }
+        OscPacket::Message(m) => match map_event_to_show_control(device, m) {
+            Ok(Some(msg)) => send.send(ControlEvent::Osc(msg)),
+            Ok(None) => (),
+            Err(e) => {
+                warn!("{}", e);
+            }
+        },
         OscPacket::Bundle(msgs) => {
             for subpacket in msgs.content {
                 forward_packet(subpacket, device, send);
@@ -1,10 +1,10 @@
-use anyhow::Result;
+use anyhow::{bail, Result};
 use log::{error, info, warn};
 use rmp_serde::Serializer;
 use serde::Serialize;
-use std::sync::mpsc::{channel, Receiver, Sender, TryRecvError};
-use std::thread;
-use tunnels_lib::{number::UnipolarFloat, Snapshot, Timestamp};
+use std::sync::{Arc, Condvar, Mutex};
+use std::{mem, thread};
+use tunnels_lib::{number::UnipolarFloat, Snapshot, Timestamp, SNAPSHOT_PORT};
 use zmq::{Context, Socket};
 
 use crate::clock_server::SharedClockData;
@@ -16,14 +16,12 @@ use crate::{
     position_bank::PositionBank,
 };
 
-const PORT: u16 = 6000;
-
 /// Renders the show state and sends it to all connected clients.
-/// Returns a channel for sending frames to be rendered.
-/// The service runs until the channel is dropped.
-pub fn start_render_service(ctx: &Context, run_clock_service: bool) -> Result<Sender<Frame>> {
+/// Returns a sender for posting frames to be rendered; it never blocks.
+/// The service runs until the sender is dropped.
+pub fn start_render_service(ctx: &Context, run_clock_service: bool) -> Result<FrameSender> {
     let socket = ctx.socket(zmq::PUB)?;
-    let addr = format!("tcp://*:{}", PORT);
+    let addr = format!("tcp://*:{}", SNAPSHOT_PORT);
     socket.bind(&addr)?;
 
     let mut clock_service = if run_clock_service {
@@ -32,13 +30,15 @@ pub fn start_render_service(ctx: &Context, run_clock_service: bool) -> Result<Se
         None
     };
 
-    let (send, mut recv) = channel();
+    let (send, recv) = frame_mailbox::<Frame>();
 
     let mut send_buf = Vec::new();
+    // Rendered layers for each video channel, reused from frame to frame.
+    let mut video_outs = Vec::new();
     thread::Builder::new()
         .name("render".to_string())
         .spawn(move || loop {
-            match get_frame(&mut recv) {
+            match recv.recv() {
                 None => {
                     info!("Render server shutting down.");
                     return;
@@ -48,19 +48,22 @@ pub fn start_render_service(ctx: &Context, run_clock_service: bool) -> Result<Se
                         warn!("Render server dropped {} frames.", dropped_frames);
                     }
 
-                    let video_outs = frame.mixer.render(
+                    frame.mixer.render(
                         &frame.clocks,
                         &frame.color_palette,
                         &frame.positions,
                         frame.audio_envelope,
+                        &mut video_outs,
                     );
-                    for (video_chan, draw_commands) in video_outs.into_iter().enumerate() {
+                    for (video_chan, draw_commands) in video_outs.iter_mut().enumerate() {
                         let snapshot = Snapshot {
                             frame_number: frame.number,
                             time: frame.timestamp,
-                            layers: draw_commands,
+                            layers: mem::take(draw_commands),
                         };
-                        send_snapshot(&mut send_buf, &socket, video_chan, snapshot);
+                        send_snapshot(&mut send_buf, &socket, video_chan, &snapshot);
+                        // Hand the buffer back for the next frame.
+                        *draw_commands = snapshot.layers;
                     }
 
                     if let Some(ref mut clock_service) = clock_service {
@@ -81,41 +84,109 @@ pub fn start_render_service(ctx: &Context, run_clock_service: bool) -> Result<Se
     Ok(send)
 }
 
-/// Block until a frame is available.
-/// Also optimistically check if there is already one or more frames backed up
-/// behind the first frame.  If so, drain them all and return the last frame
-/// received as well as the number of dropped frames.
-/// If the receiver has disconnected, return None.
-fn get_frame(recv: &mut Receiver<Frame>) -> Option<(u32, Frame)> {
-    let mut dropped_frames = 0;
-    // Wait for a frame.
-    let mut frame = match recv.recv() {
-        Ok(frame) => frame,
-        Err(_) => return None,
-    };
-    loop {
-        match recv.try_recv() {
-            Ok(newer_frame) => {
-                dropped_frames += 1;
-                frame = newer_frame;
+/// Single-slot handoff of the latest frame from the show to the render service.
+/// Posting a frame replaces any frame the render service hasn't picked up yet,
+/// so memory stays bounded and the render service always gets the newest
+/// show state.
+struct FrameMailbox<T> {
+    state: Mutex<FrameMailboxState<T>>,
+    ready: Condvar,
+}
+
+struct FrameMailboxState<T> {
+    frame: Option<T>,
+    /// Frames replaced before the render service picked them up.
+    dropped: u32,
+    /// Set when either end hangs up.
+    closed: bool,
+}
+
+impl<T> FrameMailbox<T> {
+    fn close(&self) {
+        self.state.lock().unwrap().closed = true;
+        self.ready.notify_all();
+    }
+}
+
+fn frame_mailbox<T>() -> (FrameSender<T>, FrameReceiver<T>) {
+    let mailbox = Arc::new(FrameMailbox {
+        state: Mutex::new(FrameMailboxState {
+            frame: None,
+            dropped: 0,
+            closed: false,
+        }),
+        ready: Condvar::new(),
+    });
+    (FrameSender(mailbox.clone()), FrameReceiver(mailbox))
+}
+
+/// The show's end of the frame mailbox.
+pub struct FrameSender<T = Frame>(Arc<FrameMailbox<T>>);
+
+impl<T> FrameSender<T> {
+    /// Post a frame for rendering, replacing any frame still waiting.
+    /// Return an error if the render service has gone away.
+    pub fn send(&self, frame: T) -> Result<()> {
+        let replaced = {
+            let mut state = self.0.state.lock().unwrap();
+            if state.closed {
+                bail!("Render server hung up.");
             }
-            Err(TryRecvError::Empty) => {
-                return Some((dropped_frames, frame));
+            let replaced = state.frame.replace(frame);
+            if replaced.is_some() {
+                state.dropped += 1;
             }
-            Err(TryRecvError::Disconnected) => {
+            replaced
+        };
+        self.0.ready.notify_one();
+        // Free the replaced frame only after releasing the lock, so the
+        // render service isn't kept waiting on it.
+        drop(replaced);
+        Ok(())
+    }
+}
+
+impl<T> Drop for FrameSender<T> {
+    fn drop(&mut self) {
+        self.0.close();
+    }
+}
+
+/// The render service's end of the frame mailbox.
+struct FrameReceiver<T = Frame>(Arc<FrameMailbox<T>>);
+
+impl<T> FrameReceiver<T> {
+    /// Block until a frame is available.
+    /// Return the frame as well as the number of older frames it replaced.
+    /// If the sender has hung up, return None.
+    fn recv(&self) -> Option<(u32, T)> {
+        let mut state = self.0.state.lock().unwrap();
+        loop {
+            if let Some(frame) = state.frame.take() {
+                return Some((mem::take(&mut state.dropped), frame));
+            }
+            if state.closed {
                 return None;
             }
+            state = self.0.ready.wait(state).unwrap();
         }
     }
 }
 
+impl<T> Drop for FrameReceiver<T> {
+    /// Let the show know if the render service goes away, including by panic.
+    fn drop(&mut self) {
+        self.0.close();
+    }
+}
+
 /// Serialize the provided snapshot and send it to the specified video channel.
 /// Error conditions are logged.
 fn send_snapshot(
     mut send_buf: &mut Vec<u8>,
     socket: &Socket,
     video_channel: usize,
-    snapshot: Snapshot,
+    snapshot: &Snapshot,
 ) {
     let topic = [video_channel as u8; 1];
     send_buf.clear();
@@ -146,3 +217,33 @@ pub struct Frame {
     pub positions: PositionBank,
     pub audio_envelope: UnipolarFloat,
 }
+
+#[cfg(test)]
+mod test {
+    use super::*;
+
+    #[test]
+    fn test_mailbox_keeps_newest() -> Result<()> {
+        let (send, recv) = frame_mailbox();
+        send.send(1)?;
+        send.send(2)?;
+        assert_eq!(Some((1, 2)), recv.recv());
+        send.send(3)?;
+        assert_eq!(Some((0, 3)), recv.recv());
+        Ok(())
+    }
+
+    #[test]
+    fn test_mailbox_sender_hangup() {
+        let (send, recv) = frame_mailbox::<u32>();
+        drop(send);
+        assert_eq!(None, recv.recv());
+    }
+
+    #[test]
+    fn test_mailbox_receiver_hangup() {
+        let (send, recv) = frame_mailbox();
+        drop(recv);
+        assert!(send.send(1).is_err());
+    }
+}
@@ -3,9 +3,10 @@ use log::{self, error, info, warn};
 use rmp_serde::{Deserializer, Serializer};
 use serde::{Deserialize, Serialize};
 use std::{
-    fs::File,
-    io::BufWriter,
+    fs::{self, File},
     path::{Path, PathBuf},
+    sync::mpsc::{channel, Sender},
+    thread,
     time::{Duration, Instant},
 };
 use tunnels_lib::Timestamp;
@@ -34,13 +35,50 @@ use crate::{
 /// How often should we autosave the show?
 pub const AUTOSAVE_INTERVAL: Duration = Duration::from_secs(60);
 
+/// The most control events we'll handle at once before checking if it is
+/// time to update the show state.
+const MAX_CONTROL_EVENT_BATCH: usize = 64;
+
+/// Stop handling control events this long before each update and sleep out
+/// the remainder, so that a batch of events can't make the update late.
+const UPDATE_GUARD: Duration = Duration::from_millis(1);
+
+/// The most show time we'll advance by in a single update.
+/// If we fall further behind than this (the process was suspended, say) we
+/// give up on the backlog and restart the update grid from now, rather than
+/// jumping every animation forward by the whole stall.
+/// Ordinary scheduling hiccups are far shorter than this and are caught up in
+/// full, so clocks stay in time with the music.
+const MAX_CATCHUP: Duration = Duration::from_secs(1);
+
+/// Write serialized show state to the provided path on its own thread, so
+/// that file IO never stalls the show loop.
+/// Returns a channel for sending serialized show state to be saved.
+/// The service runs until the channel is dropped.
+fn start_autosave_service(path: PathBuf) -> Result<Sender<Vec<u8>>> {
+    let (send, recv) = channel::<Vec<u8>>();
+    thread::Builder::new()
+        .name("autosave".to_string())
+        .spawn(move || {
+            for buf in recv {
+                if let Err(e) = fs::write(&path, buf) {
+                    error!("Autosave error: {}.", e);
+                }
+            }
+        })?;
+    Ok(send)
+}
+
 pub struct Show {
     dispatcher: Dispatcher,
     audio_input: AudioInput,
     run_clock_service: bool,
     state: ShowState,
-    save_path: Option<PathBuf>,
+    /// Channel to the autosave service, if we have a save path.
+    autosave: Option<Sender<Vec<u8>>>,
     last_save: Option<Instant>,
+    /// Buffer for control messages waiting to be handled.
+    control_messages: Vec<ControlMessage>,
 }
 
 impl Show {
@@ -70,8 +108,9 @@ impl Show {
                 positions: PositionBank::default(),
                 color_palette: ColorPalette::new(),
             },
-            save_path,
+            autosave: save_path.map(start_autosave_service).transpose()?,
             last_save: None,
+            control_messages: Vec::with_capacity(MAX_CONTROL_EVENT_BATCH),
         })
     }
 
@@ -99,29 +138,29 @@ impl Show {
         Ok(())
     }
 
-    /// Save the show into the provided file.
-    fn save(&self, path: &Path) -> Result<()> {
-        let mut file = File::create(path)?;
-        self.state
-            .serialize(&mut Serializer::new(BufWriter::new(&mut file)))?;
-        Ok(())
+    /// Serialize the show state into a buffer.
+    fn serialize_state(&self) -> Result<Vec<u8>> {
+        let mut buf = Vec::new();
+        self.state.serialize(&mut Serializer::new(&mut buf))?;
+        Ok(buf)
     }
 
     /// If a save path is set and we're due to save, save the show.
-    fn autosave(&mut self) -> Result<()> {
-        if let Some(path) = &self.save_path {
-            let now = Instant::now();
+    /// The show state is serialized here, but written to disk by the
+    /// autosave service.
+    fn autosave(&mut self, now: Instant) -> Result<()> {
+        if let Some(autosave) = &self.autosave {
             let should_save = match self.last_save {
                 Some(t) => (t + AUTOSAVE_INTERVAL) <= now,
                 None => true,
             };
             if should_save {
                 info!("Autosaving.");
-                let result = self.save(path);
-                if result.is_ok() {
-                    self.last_save = Some(now);
+                let buf = self.serialize_state()?;
+                if autosave.send(buf).is_err() {
+                    bail!("Autosave service hung up.");
                 }
-                return result;
+                self.last_save = Some(now);
             }
         }
         Ok(())
@@ -158,46 +197,79 @@ impl Show {
         let frame_sender = start_render_service(&ctx, self.run_clock_service)?;
 
         let mut last_update = start;
+        // Deadline for the next state update, kept in step with last_update.
+        let mut next_update = start + update_interval;
+
+        let max_catchup_steps = (MAX_CATCHUP.as_nanos() / update_interval.as_nanos()).max(1) as u32;
 
         loop {
-            let now = Instant::now();
-            let time_since_update = now - last_update;
-            if time_since_update >= update_interval {
-                self.update_state(time_since_update);
-                last_update = now;
-                let timestamp = Timestamp::since(start);
-
-                if frame_sender
-                    .send(Frame {
-                        number: frame_number,
-                        timestamp,
-                        mixer: self.state.mixer.clone(),
-                        clocks: self.state.clocks.clone(),
-                        color_palette: self.state.color_palette.clone(),
-                        positions: self.state.positions.clone(),
-                        audio_envelope: self.audio_input.envelope(),
-                    })
-                    .is_err()
-                {
-                    bail!("Render server hung up.  Aborting show.");
+            // Read the clock once per iteration, and again only if we did
+            // update work that took time.
+            let mut now = Instant::now();
+            if now >= next_update {
+                let time_since_update = now - last_update;
+
+                // Advance by a whole number of update intervals in a single
+                // step, carrying the remainder over to the next update so that
+                // updates stay on a fixed time grid.
+                let n_steps = time_since_update.as_nanos() / update_interval.as_nanos();
+                if n_steps > max_catchup_steps as u128 {
+                    let delta_t = update_interval * max_catchup_steps;
+                    warn!(
+                        "Show stalled for {:?}; skipping {:?} of show time.",
+                        time_since_update,
+                        time_since_update - delta_t
+                    );
+                    self.update_state(delta_t);
+                    last_update = now;
+                } else {
+                    let delta_t = update_interval * n_steps as u32;
+                    self.update_state(delta_t);
+                    last_update += delta_t;
                 }
+                next_update = last_update + update_interval;
+                // Stamp the frame with the show time it was evolved to, in
+                // whole microseconds on the update grid, rather than reading
+                // the clock again.
+                let timestamp = Timestamp::from_duration(last_update - start);
+
+                // Never wait on the render service; if it is behind, this
+                // frame replaces the one it hasn't picked up yet.
+                frame_sender.send(Frame {
+                    number: frame_number,
+                    timestamp,
+                    mixer: self.state.mixer.clone(),
+                    clocks: self.state.clocks.clone(),
+                    color_palette: self.state.color_palette.clone(),
+                    positions: self.state.positions.clone(),
+                    audio_envelope: self.audio_input.envelope(),
+                })?;
                 frame_number += 1;
-            }
 
-            // Consider autosaving the show.
-            if let Err(e) = self.autosave() {
-                error!("Autosave error: {}.", e);
+                // Send UI updates accumulated since the last frame.
+                self.dispatcher.flush();
+
+                // Consider autosaving the show; the state only changes
+                // meaningfully on an update, so only check here.
+                if let Err(e) = self.autosave(now) {
+                    error!("Autosave error: {}.", e);
+                }
+
+                // Frame handoff, UI flush and autosave all take time; don't
+                // count it as time we can spend waiting.
+                now = Instant::now();
             }
 
-            // Process a control event for a fraction of the time between now
-            // and when we need to update state again.
-            if let Some(time_to_next_update) =
-                (last_update + update_interval).checked_duration_since(Instant::now())
-            {
-                // Use 80% of the time remaining to potentially process a
-                // control event.
-                let timeout = time_to_next_update.mul_f64(0.8);
-                self.service_control_event(timeout);
+            if let Some(time_to_next_update) = next_update.checked_duration_since(now) {
+                if time_to_next_update > UPDATE_GUARD {
+                    // Process control events until shortly before we need to
+                    // update state again.
+                    self.service_control_events(time_to_next_update - UPDATE_GUARD);
+                } else {
+                    // Too close to the update to take on control events; wait
+                    // out the rest in one go rather than polling.
+                    thread::sleep(time_to_next_update);
+                }
             }
         }
     }
@@ -211,9 +283,12 @@ impl Show {
         self.state.mixer.update_state(delta_t, audio_envelope);
     }
 
-    fn service_control_event(&mut self, timeout: Duration) {
-        match self.dispatcher.receive(timeout) {
-            Ok(Some(msg)) => self.state.ui.handle_control_message(
+    /// Handle incoming control events, waiting up to timeout for the first.
+    fn service_control_events(&mut self, timeout: Duration) {
+        self.dispatcher
+            .receive(timeout, MAX_CONTROL_EVENT_BATCH, &mut self.control_messages);
+        for msg in self.control_messages.drain(..) {
+            self.state.ui.handle_control_message(
                 msg,
                 &mut self.state.mixer,
                 &mut self.state.clocks,
@@ -221,11 +296,7 @@ impl Show {
                 &mut self.state.positions,
                 &mut self.audio_input,
                 &mut self.dispatcher,
-            ),
-            Ok(None) => (),
-            Err(e) => {
-                warn!("{}", e);
-            }
+            );
         }
     }
 }
@@ -296,11 +367,13 @@ mod test {
 
     /// Render the state of the show with some assertions on structure.
     fn check_render(show: &Show, unique_beam_count: usize) -> LayerCollection {
-        let video_feeds = show.state.mixer.render(
+        let mut video_feeds = Vec::new();
+        show.state.mixer.render(
             &show.state.clocks,
             &show.state.color_palette,
             &show.state.positions,
             UnipolarFloat::ZERO,
+            &mut video_feeds,
         );
 
         // Should have the expected number of video channels.
@@ -32,6 +32,14 @@ pub fn all_video_outputs(_: usize, i: usize, channel: &mut Channel) {
     }
 }
 
+/// Waveforms assigned in turn to each animation in the stress test.
+const STRESS_WAVEFORMS: [Waveform; 4] = [
+    Waveform::Sine,
+    Waveform::Triangle,
+    Waveform::Square,
+    Waveform::Sawtooth,
+];
+
 /// A test mode designed to load the console as hard possible.
 pub fn stress(channel_count: usize, i: usize, channel: &mut Channel) {
     channel.level = UnipolarFloat::ONE;
@@ -39,37 +47,31 @@ pub fn stress(channel_count: usize, i: usize, channel: &mut Channel) {
     if let Beam::Tunnel(ref mut tunnel) = channel.beam {
         use TunnelStateChange::*;
 
-        set_tunnel_state(tunnel, ColorWidth(UnipolarFloat::new(0.25)));
-        set_tunnel_state(tunnel, ColorSpread(UnipolarFloat::ONE));
-        set_tunnel_state(tunnel, ColorSaturation(UnipolarFloat::new(0.25)));
-        set_tunnel_state(
-            tunnel,
+        for state in [
+            ColorWidth(UnipolarFloat::new(0.25)),
+            ColorSpread(UnipolarFloat::ONE),
+            ColorSaturation(UnipolarFloat::new(0.25)),
+            // Spread the marquee speeds across the channels.
             MarqueeSpeed(BipolarFloat::new(
                 -1.0 + (2.0 * i as f64 / channel_count as f64),
             )),
-        );
-        set_tunnel_state(tunnel, Blacking(BipolarFloat::ZERO));
+            Blacking(BipolarFloat::ZERO),
+        ] {
+            set_tunnel_state(tunnel, state);
+        }
 
         for (i, anim) in tunnel.animations().enumerate() {
-            set_animation_state(
-                &mut anim.animation,
-                AnimationStateChange::Waveform(match i % 4 {
-                    0 => Waveform::Sine,
-                    1 => Waveform::Triangle,
-                    2 => Waveform::Square,
-                    _ => Waveform::Sawtooth,
-                }),
-            );
-            set_animation_state(
-                &mut anim.animation,
-                AnimationStateChange::Speed(BipolarFloat::new(i as f64 / 3.0)),
-            );
-            set_animation_state(
-                &mut anim.animation,
-                AnimationStateChange::Size(UnipolarFloat::new(0.5)),
-            );
+            use AnimationStateChange::*;
+
+            for state in [
+                Waveform(STRESS_WAVEFORMS[i % STRESS_WAVEFORMS.len()]),
+                Speed(BipolarFloat::new(i as f64 / 3.0)),
+                Size(UnipolarFloat::new(0.5)),
+                NPeriods(3),
+            ] {
+                set_animation_state(&mut anim.animation, state);
+            }
             anim.target = AnimationTarget::Thickness;
-            set_animation_state(&mut anim.animation, AnimationStateChange::NPeriods(3));
         }
     }
 }
@@ -5,11 +5,10 @@ use std::time::Instant;
 
 use rmp_serde::Serializer;
 use serde::Serialize;
-use tunnels_lib::{RunFlag, Timestamp};
+use tunnels_lib::{RunFlag, Timestamp, TIMESYNC_PORT};
 
 use zmq::Context;
 
-const PORT: u64 = 8989;
 pub struct TimesyncServer {
     join_handle: Option<thread::JoinHandle<()>>,
     run: RunFlag,
@@ -20,7 +19,7 @@ impl TimesyncServer {
     /// The server will run until it is dropped.
     pub fn start(ctx: &Context, start: Instant) -> Result<Self> {
         let socket = ctx.socket(zmq::REP)?;
-        let addr = format!("tcp://*:{}", PORT);
+        let addr = format!("tcp://*:{}", TIMESYNC_PORT);
         socket.bind(&addr)?;
         // time out once per second
         socket.set_rcvtimeo(1000)?;
@@ -1,12 +1,11 @@
 use crate::{
-    animation::Animation,
+    animation::{Animation, AnimationSampler},
     animation_target::AnimationTarget,
     clock_bank::ClockBank,
     palette::{ColorPalette, ColorPaletteIdx},
     position_bank::{PositionBank, PositionIdx},
-    waveforms::WaveformArgs,
 };
-use crate::{master_ui::EmitStateChange as EmitShowStateChange, waveforms::sawtooth};
+use crate::{master_ui::EmitStateChange as EmitShowStateChange, waveforms::sawtooth_sharp};
 use serde::{Deserialize, Serialize};
 use std::cmp::{max, min};
 use std::time::Duration;
@@ -128,18 +127,24 @@ impl Tunnel {
         }
         let timestep_secs = delta_t.as_secs_f64();
 
+        // Most beams aren't rotating; only integrate the angles that are moving.
+
         // calulcate the rotation
         // delta_t*30. implies the same speed scale as we had at 30fps with evolution tied to frame
-        self.curr_rot_angle +=
-            (scale_speed(self.rot_speed).val() * timestep_secs * 30.) * ROT_SPEED_SCALE;
+        if self.rot_speed.val() != 0.0 {
+            self.curr_rot_angle +=
+                (scale_speed(self.rot_speed).val() * timestep_secs * 30.) * ROT_SPEED_SCALE;
+        }
 
         // calulcate the marquee angle
         // delta_t*30 implies the same speed scale as we had at 30fps with evolution tied to frame
-        self.curr_marquee_angle +=
-            (scale_speed(self.marquee_speed).val() * timestep_secs * 30.) * MARQUEE_SPEED_SCALE;
+        if self.marquee_speed.val() != 0.0 {
+            self.curr_marquee_angle +=
+                (scale_speed(self.marquee_speed).val() * timestep_secs * 30.) * MARQUEE_SPEED_SCALE;
+        }
     }
 
-    /// Render the current state of the tunnel.
+    /// Render the current state of the tunnel, appending the arc segments to arcs.
     pub fn render(
         &self,
         level_scale: UnipolarFloat,
@@ -148,7 +153,8 @@ impl Tunnel {
         color_palette: &ColorPalette,
         positions: &PositionBank,
         audio_envelope: UnipolarFloat,
-    ) -> Vec<ArcSegment> {
+        arcs: &mut Vec<ArcSegment>,
+    ) {
         // for artistic reasons/convenience, eliminate odd numbers of segments above 40.
         let segs = if self.segs > 40 && self.segs % 2 != 0 {
             self.segs + 1
@@ -156,8 +162,19 @@ impl Tunnel {
             self.segs
         };
         let blacking = self.blacking_integer();
+        // Positive blacking draws every nth segment, so we can step directly
+        // from one drawn segment to the next.
+        let draw_stride = if blacking > 0 { blacking as usize } else { 1 };
+        // Negative blacking draws all but every nth segment.
+        // Most blacking values are powers of two; test those with a mask
+        // rather than a division.
+        let blacking_mask = {
+            let b = blacking.unsigned_abs();
+            b.is_power_of_two().then(|| (b - 1) as i32)
+        };
 
-        let mut arcs = Vec::new();
+        // Blacking only ever removes segments, so this is all we'll need.
+        arcs.reserve(segs as usize);
 
         let marquee_interval = 1.0 / segs as f64;
 
@@ -182,18 +199,49 @@ impl Tunnel {
             self.col_center.val()
         };
 
+        // The number of color periods around the tunnel, before animation.
+        let col_periods = (COLOR_SPREAD_SCALE * self.col_spread.val()).floor();
+
+        // Look up each animation's clock and scaling once for the whole frame,
+        // packing the active animations together with their targets.
+        // Most of the time no animations are running; if so, there is nothing
+        // to evaluate for each segment.
+        let mut active_anims: [Option<(AnimationTarget, AnimationSampler)>; N_ANIM] =
+            Default::default();
+        let mut n_active_anims = 0;
+        for anim in &self.anims {
+            if let Some(sampler) = anim.animation.sampler(external_clocks, audio_envelope) {
+                active_anims[n_active_anims] = Some((anim.target, sampler));
+                n_active_anims += 1;
+            }
+        }
+        let active_anims = &active_anims[..n_active_anims];
+
+        // Parameters that are constant across every segment of this frame.
+        let thickness = self.thickness.val();
+        let thickness_allowance = thickness * THICKNESS_SCALE / 2.;
+        let size = self.size.val();
+        let aspect_ratio = self.aspect_ratio.val();
+        let col_width = self.col_width.val();
+        let col_sat = self.col_sat.val();
+        let level = level_scale.val();
+
         // Iterate over each segment ID and skip the segments that are blacked.
-        for seg_num in 0..segs {
-            let should_draw_segment = if blacking > 0 {
-                (seg_num as i32) % blacking == 0
-            } else {
-                (seg_num as i32) % blacking != 0
-            };
-            if !should_draw_segment {
-                continue;
+        for seg_num in (0..segs as i32).step_by(draw_stride) {
+            if blacking < 0 {
+                let on_blacking_interval = match blacking_mask {
+                    Some(mask) => (seg_num & mask) == 0,
+                    None => seg_num % blacking == 0,
+                };
+                if on_blacking_interval {
+                    continue;
+                }
             }
 
-            let rel_angle = Phase::new(marquee_interval * seg_num as f64);
+            // The offset of this segment from the marquee origin.
+            let seg_angle = marquee_interval * seg_num as f64;
+
+            let rel_angle = Phase::new(seg_angle);
 
             let mut thickness_adjust = 0.;
             let mut size_adjust = 0.;
@@ -207,13 +255,11 @@ impl Tunnel {
             let mut rot_angle_adjust = 0.;
             let mut marquee_angle_adjust = 0.;
             // accumulate animation adjustments based on targets
-            for anim in &self.anims {
-                let anim_value =
-                    anim.animation
-                        .get_value(rel_angle, external_clocks, audio_envelope);
+            for (target, sampler) in active_anims.iter().flatten() {
+                let anim_value = sampler.sample(rel_angle);
 
                 use AnimationTarget::*;
-                match anim.target {
+                match target {
                     Rotation => rot_angle_adjust += anim_value,
                     MarqueeRotation => marquee_angle_adjust += anim_value,
                     Thickness => thickness_adjust += anim_value,
@@ -230,25 +276,21 @@ impl Tunnel {
             // the abs() is there to prevent negative width setting when using multiple animations.
             // TODO: consider if we should change this behavior to make thickness clamp at 0 instead
             // of bounce back via absolute value here.
-            let stroke_weight = (self.thickness.val() * (1. + thickness_adjust)).abs();
-            let thickness_allowance = self.thickness.val() * THICKNESS_SCALE / 2.;
+            let stroke_weight = (thickness * (1. + thickness_adjust)).abs();
 
             // geometry calculations
             let x_center = x_offset + x_adjust;
             let y_center = y_offset + y_adjust;
 
             // compute ellipse parameters
-            let radius_x = ((self.size.val()
-                * (MAX_ASPECT_RATIO * (self.aspect_ratio.val() + aspect_ratio_adjust))
+            let radius_x = ((size * (MAX_ASPECT_RATIO * (aspect_ratio + aspect_ratio_adjust))
                 - thickness_allowance)
                 + size_adjust)
                 .abs();
-            let radius_y = (self.size.val() - thickness_allowance + size_adjust).abs();
+            let radius_y = (size - thickness_allowance + size_adjust).abs();
 
             // The angle of this particular segment.
-            let start_angle: Phase = self.curr_marquee_angle
-                + marquee_interval * (seg_num as f64)
-                + marquee_angle_adjust;
+            let start_angle: Phase = self.curr_marquee_angle + seg_angle + marquee_angle_adjust;
 
             // this angle may exceed 1.0; this is important for correctly displaying
             // arcs that cross the angular origin.
@@ -275,23 +317,14 @@ impl Tunnel {
                 let hue = Phase::new(
                     (base_hue + col_center_adjust)
                         + (0.5
-                            * (self.col_width.val() + col_width_adjust)
-                            * sawtooth(&WaveformArgs {
-                                phase_spatial: rel_angle
-                                    * ((COLOR_SPREAD_SCALE * self.col_spread.val()).floor()
-                                        + col_period_adjust),
-                                phase_temporal: Phase::ZERO,
-                                smoothing: UnipolarFloat::ZERO,
-                                duty_cycle: UnipolarFloat::ONE,
-                                pulse: false,
-                                standing: false,
-                            })),
+                            * (col_width + col_width_adjust)
+                            * sawtooth_sharp(rel_angle * (col_periods + col_period_adjust))),
                 );
 
-                let sat = UnipolarFloat::new(self.col_sat.val() + col_sat_adjust);
+                let sat = UnipolarFloat::new(col_sat + col_sat_adjust);
 
                 ArcSegment {
-                    level: level_scale.val(),
+                    level,
                     thickness: stroke_weight,
                     hue: hue.val(),
                     sat: sat.val(),
@@ -307,7 +340,6 @@ impl Tunnel {
             };
             arcs.push(arc);
         }
-        arcs
     }
 
     /// Emit the current value of all controllable tunnel state.
@@ -134,14 +134,10 @@ fn square_spatial(args: &WaveformArgsSpatial) -> f64 {
         return 0.0;
     }
 
-    let phase = args.duty_cycle_scaled_phase();
+    let mut phase = args.duty_cycle_scaled_phase();
+    // A pulse is the first half of the full waveform.
     if args.pulse {
-        return square_spatial(&WaveformArgsSpatial {
-            phase: phase * UnipolarFloat::new(0.5),
-            smoothing: args.smoothing,
-            duty_cycle: UnipolarFloat::new(1.0),
-            pulse: false,
-        });
+        phase = phase * UnipolarFloat::new(0.5);
     }
     // internal smoothing scale is 0 to 0.25.
     let smoothing = args.smoothing * UnipolarFloat::new(0.25);
@@ -172,24 +168,16 @@ fn sawtooth_spatial(args: &WaveformArgsSpatial) -> f64 {
     if args.outside_duty_cycle() {
         return 0.0;
     }
-    let phase = args.duty_cycle_scaled_phase();
+    let mut phase = args.duty_cycle_scaled_phase();
 
+    // A pulse is the first half of the full waveform.
     if args.pulse {
-        return sawtooth_spatial(&WaveformArgsSpatial {
-            phase: phase * UnipolarFloat::new(0.5),
-            smoothing: args.smoothing,
-            duty_cycle: UnipolarFloat::new(1.0),
-            pulse: false,
-        });
+        phase = phase * UnipolarFloat::new(0.5);
     }
     // internal smoothing scale is 0 to 0.25.
     let smoothing = args.smoothing * UnipolarFloat::new(0.25);
     if smoothing == 0.0 {
-        return if phase < 0.5 {
-            2.0 * phase.val()
-        } else {
-            2.0 * (phase.val() - 1.0)
-        };
+        return sawtooth_sharp(phase);
     }
 
     if phase < 0.5 - smoothing.val() {
@@ -201,6 +189,17 @@ fn sawtooth_spatial(args: &WaveformArgsSpatial) -> f64 {
     }
 }
 
+/// An unsmoothed, travelling sawtooth with full duty cycle.
+/// Equivalent to sawtooth with those args, for callers that always use them
+/// and want to skip the general case's bookkeeping.
+pub fn sawtooth_sharp(phase: Phase) -> f64 {
+    if phase < 0.5 {
+        2.0 * phase.val()
+    } else {
+        2.0 * (phase.val() - 1.0)
+    }
+}
+
 #[cfg(test)]
 #[allow(unused)]
 mod test {
@@ -243,6 +242,22 @@ mod test {
         Ok(())
     }
 
+    #[test]
+    fn test_sawtooth_sharp() {
+        for i in 0..1000 {
+            let phase = Phase::new(i as f64 / 1000.);
+            let general = sawtooth(&WaveformArgs {
+                phase_spatial: phase,
+                phase_temporal: Phase::ZERO,
+                smoothing: UnipolarFloat::ZERO,
+                duty_cycle: UnipolarFloat::ONE,
+                pulse: false,
+                standing: false,
+            });
+            assert_eq!(general, sawtooth_sharp(phase));
+        }
+    }
+
     fn generate_span(
         f: fn(&WaveformArgsSpatial) -> f64,
         smoothing: f64,
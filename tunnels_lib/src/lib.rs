@@ -12,11 +12,17 @@ use std::{
     hash::{Hash, Hasher},
     sync::{
         atomic::{AtomicBool, Ordering},
-        Arc,
+        Arc, Condvar, Mutex,
     },
     time::{Duration, Instant},
 };
 
+/// Port on which the console publishes rendered snapshots to clients.
+pub const SNAPSHOT_PORT: u16 = 6000;
+
+/// Port on which the console answers client timesync requests.
+pub const TIMESYNC_PORT: u16 = 8989;
+
 /// Timestamp used for expressing moments in time, has units of microseconds.
 /// Normally computed by the show controller as the number of microseconds since
 /// the show launched.
@@ -69,23 +75,51 @@ impl num_traits::cast::ToPrimitive for Timestamp {
 /// A helper wrapper around an atomically-reference-counted atomic boolean.
 /// Used to control program flow across multiple threads.
 #[derive(Debug, Clone)]
-pub struct RunFlag(Arc<AtomicBool>);
+pub struct RunFlag(Arc<RunFlagState>);
+
+#[derive(Debug)]
+struct RunFlagState {
+    run: AtomicBool,
+    /// Guards waits on stopped, so a stop cannot slip in between a waiting
+    /// thread checking the flag and going to sleep.
+    lock: Mutex<()>,
+    stopped: Condvar,
+}
 
 impl Default for RunFlag {
     fn default() -> Self {
-        RunFlag(Arc::new(AtomicBool::new(true)))
+        RunFlag(Arc::new(RunFlagState {
+            run: AtomicBool::new(true),
+            lock: Mutex::new(()),
+            stopped: Condvar::new(),
+        }))
     }
 }
 
 impl RunFlag {
     /// Return true if the program should continue.
     pub fn should_run(&self) -> bool {
-        self.0.load(Ordering::Relaxed)
+        self.0.run.load(Ordering::Relaxed)
     }
 
     /// Command the program to stop.
+    /// Wakes up any threads blocked in wait.
     pub fn stop(&mut self) {
-        self.0.store(false, Ordering::Relaxed);
+        self.0.run.store(false, Ordering::Relaxed);
+        let _guard = self.0.lock.lock().unwrap();
+        self.0.stopped.notify_all();
+    }
+
+    /// Block for up to timeout, returning early if the flag is stopped.
+    /// Return true if the program should continue.
+    pub fn wait(&self, timeout: Duration) -> bool {
+        let guard = self.0.lock.lock().unwrap();
+        let _ = self
+            .0
+            .stopped
+            .wait_timeout_while(guard, timeout, |_| self.should_run())
+            .unwrap();
+        self.should_run()
     }
 }
 
@@ -209,7 +243,8 @@ pub fn arc_segment_for_test(linear: f64, radial: f64) -> ArcSegment {
 
 #[cfg(test)]
 pub mod test {
-    use crate::arc_segment_for_test;
+    use crate::{arc_segment_for_test, RunFlag};
+    use std::{thread, time::Duration};
 
     #[test]
     fn test_arc_eq() {
@@ -218,4 +253,15 @@ pub mod test {
         assert_eq!(a, a);
         assert_ne!(a, b);
     }
+
+    #[test]
+    fn test_run_flag_wait() {
+        let flag = RunFlag::default();
+        assert!(flag.wait(Duration::from_millis(1)));
+
+        let mut stopper = flag.clone();
+        let handle = thread::spawn(move || stopper.stop());
+        assert!(!flag.wait(Duration::from_secs(60)));
+        handle.join().unwrap();
+    }
 }
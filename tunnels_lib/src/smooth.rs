@@ -41,6 +41,10 @@ impl<T: Add<Output = T> + Copy + Mul<f64, Output = T>> Smoother<T> {
 
     // Update the state of this smoother.
     pub fn update_state(&mut self, delta_t: Duration) {
+        // Nothing to do if we've already arrived at the target.
+        if self.alpha == UnipolarFloat::ONE {
+            return;
+        }
         let delta_alpha = delta_t.as_secs_f64() / self.smooth_time.as_secs_f64();
         self.alpha += delta_alpha;
     }
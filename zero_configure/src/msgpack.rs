@@ -1,10 +1,7 @@
 //! Helper trait for working with msgpack.
 
 use anyhow::Result;
-use rmp_serde::Deserializer;
 use serde::de::DeserializeOwned;
-use serde::Deserialize;
-use std::io::Cursor;
 
 pub type ReceiveResult<T> = Result<T>;
 
@@ -16,10 +13,8 @@ pub trait Receive {
 
     /// Deserialize a received message.
     fn deserialize_msg<T: DeserializeOwned>(&self, msg: Vec<u8>) -> ReceiveResult<T> {
-        let cur = Cursor::new(&msg[..]);
-        let mut de = Deserializer::new(cur);
-        let typed_msg = Deserialize::deserialize(&mut de)?;
-        Ok(typed_msg)
+        // Decode straight from the buffer rather than through an io::Read.
+        Ok(rmp_serde::from_slice(&msg)?)
     }
 
     /// Receive a single message.